@@ -6,8 +6,11 @@ from mcp.server.auth.provider import AccessToken
 from mcp.types import INTERNAL_ERROR, INVALID_PARAMS
 from pydantic import BaseModel, Field
 from datetime import datetime
+import functools
 import json
 import os
+import re
+import sys
 from dotenv import load_dotenv
 PORT = int(os.environ.get("PORT", 8085))
 
@@ -44,6 +47,73 @@ business_db = {
     }
 }
 
+# Matches one order line such as "1kg surmai", "1.5 kg pomfret" or "2 prawns"
+_ITEM_RE = re.compile(r"(\d*\.\d+|\d+\.?)\s*(kg)?\s*(.*)")
+
+# Menu names paired with their lowercase form, computed once for substring matching
+_menu_lower_pairs = tuple(
+    (name, name.lower()) for name in business_db["manglore_fishmonger"]["menu"]
+)
+
+# Display strings for each menu item, formatted once since prices and stock are static
+_price_str = {
+    name: f"₹{details['price']}/{details['unit']}"
+    for name, details in business_db["manglore_fishmonger"]["menu"].items()
+}
+_status_str = {
+    name: "✅ Available" if details["available"] else "❌ Out of Stock"
+    for name, details in business_db["manglore_fishmonger"]["menu"].items()
+}
+
+def _format_menu(names) -> dict:
+    """Builds the /menu response for the given menu item names"""
+    business = business_db["manglore_fishmonger"]
+    formatted_menu = [
+        {
+            "item": name,
+            "price": _price_str[name],
+            "status": _status_str[name]
+        }
+        for name in names
+    ]
+    return {
+        "business": business["name"],
+        "menu": formatted_menu,
+        "contact": business["contact"],
+        "note": "Use '/order [items]' to place an order. Example: '/order 1kg surmai, 2kg bangda'"
+    }
+
+@functools.lru_cache(maxsize=128)
+def _search_menu(item_lower: str) -> tuple:
+    """Returns the menu item names containing `item_lower`"""
+    return tuple(name for name, low in _menu_lower_pairs if item_lower in low)
+
+# The menu, location and help payloads are static, so build them once and share them
+_FULL_MENU_RESPONSE = _format_menu(business_db["manglore_fishmonger"]["menu"])
+
+_LOCATION_RESPONSE = {
+    "business": business_db["manglore_fishmonger"]["name"],
+    "address": business_db["manglore_fishmonger"]["location"],
+    "map_link": "https://maps.app.goo.gl/EXAMPLE",  # Replace with actual Google Maps link
+    "hours": "Open daily 6AM-8PM"
+}
+
+_HELP_RESPONSE = {
+    "commands": [
+        {"command": "/menu", "description": "Show full menu or search items"},
+        {"command": "/order [items]", "description": "Place an order (e.g., /order 1kg surmai, 2 prawns)"},
+        {"command": "/location", "description": "Get shop address and hours"},
+        {"command": "/help", "description": "Show this help message"},
+    ],
+    "example_order": "/order 1kg surmai, 2 prawns - Name: John, Contact: +919876543210, Notes: Clean and cut"
+}
+
+_ORDER_NEXT_STEPS = (
+    "💰 Payment: Cash on delivery",
+    "📞 You'll receive a confirmation call",
+    "⏱️ Delivery within 2 hours"
+)
+
 class SimpleBearerAuthProvider(BearerAuthProvider):
     """Simple authentication provider"""
     def __init__(self, token: str):
@@ -68,7 +138,7 @@ class BusinessOrder(BaseModel):
     customer_contact: str
     items: Dict[str, float]
     special_instructions: str = ""
-    timestamp: str = datetime.now().isoformat()
+    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
 
 mcp = FastMCP(
     "Manglore FishMonger MCP Server",
@@ -86,37 +156,16 @@ async def get_menu(item: str = None) -> dict:
     Returns the full menu or searches for a specific item.
     Example: `/menu` or `/menu pomfret`
     """
-    menu = business_db["manglore_fishmonger"]["menu"]
+    if not item:
+        return _FULL_MENU_RESPONSE
     
-    if item:
-        item_lower = item.lower()
-        results = {
-            name: details
-            for name, details in menu.items()
-            if item_lower in name.lower()
-        }
-        if not results:
-            raise McpError(ErrorData(
-                code=INVALID_PARAMS,
-                message=f"No items found matching '{item}'"
-            ))
-        menu = results
-    
-    formatted_menu = [
-        {
-            "item": name,
-            "price": f"₹{details['price']}/{details['unit']}",
-            "status": "✅ Available" if details["available"] else "❌ Out of Stock"
-        }
-        for name, details in menu.items()
-    ]
-    
-    return {
-        "business": business_db["manglore_fishmonger"]["name"],
-        "menu": formatted_menu,
-        "contact": business_db["manglore_fishmonger"]["contact"],
-        "note": "Use '/order [items]' to place an order. Example: '/order 1kg surmai, 2kg bangda'"
-    }
+    names = _search_menu(item.lower())
+    if not names:
+        raise McpError(ErrorData(
+            code=INVALID_PARAMS,
+            message=f"No items found matching '{item}'"
+        ))
+    return _format_menu(names)
 
 @mcp.tool(description="Place an order. Usage: `/order [items]`. Example: `/order 1kg surmai, 2 prawns`")
 async def place_order(
@@ -142,21 +191,19 @@ async def place_order(
             continue
             
         # Handle both "1kg surmai" and "2 prawns" formats
-        if "kg" in item_str:
-            parts = item_str.split("kg", 1)
-            qty = float(parts[0].strip())
-            item_name = parts[1].strip()
-        else:
-            parts = item_str.split(" ", 1)
-            qty = float(parts[0].strip())
-            item_name = parts[1].strip()
+        match = _ITEM_RE.fullmatch(item_str)
+        if not match:
+            errors.append(f"❌ Couldn't understand '{item_str}' (expected e.g. '1kg surmai')")
+            continue
+        qty = float(match[1])
+        item_name = match[3]
+        if not item_name:
+            errors.append(f"❌ Missing item name in '{item_str}'")
+            continue
         
         # Find matching menu item (case insensitive, partial match)
-        matched_item = None
-        for menu_item in menu.keys():
-            if item_name.lower() in menu_item.lower():
-                matched_item = menu_item
-                break
+        matches = _search_menu(item_name.lower())
+        matched_item = matches[0] if matches else None
                 
         if not matched_item:
             errors.append(f"❌ '{item_name}' not found in menu")
@@ -180,13 +227,19 @@ async def place_order(
             message="No valid items in order"
         ))
     
-    # Calculate total
-    total = sum(
-        menu[item]["price"] * qty
-        for item, qty in parsed_items.items()
-    )
+    # Calculate line totals and order summary in a single pass
+    total = 0
+    order_summary = []
+    for item, qty in parsed_items.items():
+        details = menu[item]
+        line_total = details["price"] * qty
+        total += line_total
+        order_summary.append(
+            f"- {item}: {qty}{details['unit']} × ₹{details['price']} = ₹{line_total}"
+        )
     
-    # Create and store order
+    # Create and store order; repeat customers share one copy of their contact string
+    customer_contact = sys.intern(customer_contact)
     order = BusinessOrder(
         customer_name=customer_name,
         customer_contact=customer_contact,
@@ -195,12 +248,6 @@ async def place_order(
     )
     business_db[business_id]["orders"].append(order.model_dump())
     
-    # Format order summary
-    order_summary = [
-        f"- {item}: {qty}{menu[item]['unit']} × ₹{menu[item]['price']} = ₹{menu[item]['price'] * qty}"
-        for item, qty in parsed_items.items()
-    ]
-    
     return {
         "status": "✅ Order Placed Successfully!",
         "business": business_db[business_id]["name"],
@@ -209,35 +256,18 @@ async def place_order(
         "items": order_summary,
         "total": f"₹{total}",
         "instructions": special_instructions or "None",
-        "next_steps": [
-            "💰 Payment: Cash on delivery",
-            "📞 You'll receive a confirmation call",
-            "⏱️ Delivery within 2 hours"
-        ]
+        "next_steps": _ORDER_NEXT_STEPS
     }
 
 @mcp.tool(description="Get business location. Usage: `/location`")
 async def get_location() -> dict:
     """Returns the business address and map link"""
-    return {
-        "business": business_db["manglore_fishmonger"]["name"],
-        "address": business_db["manglore_fishmonger"]["location"],
-        "map_link": "https://maps.app.goo.gl/EXAMPLE",  # Replace with actual Google Maps link
-        "hours": "Open daily 6AM-8PM"
-    }
+    return _LOCATION_RESPONSE
 
 @mcp.tool(description="Show help. Usage: `/help`")
 async def show_help() -> dict:
     """Returns available commands"""
-    return {
-        "commands": [
-            {"command": "/menu", "description": "Show full menu or search items"},
-            {"command": "/order [items]", "description": "Place an order (e.g., /order 1kg surmai, 2 prawns)"},
-            {"command": "/location", "description": "Get shop address and hours"},
-            {"command": "/help", "description": "Show this help message"},
-        ],
-        "example_order": "/order 1kg surmai, 2 prawns - Name: John, Contact: +919876543210, Notes: Clean and cut"
-    }
+    return _HELP_RESPONSE
 
 async def main():
     await mcp.run_async(